@@ -1,36 +1,63 @@
 """
 Simple multi‑armed bandit for rule selection.
 
-In this prototype we use a uniform random choice among available rules.  A more
-advanced implementation might use Thompson sampling or another contextual
-bandit algorithm.  The class is used by the write gate to decide which of
-several competing self rules to apply in a given context.
+Arms are selected with Beta‑Thompson sampling: each arm keeps a success and a
+failure count, and ``select`` draws one sample from the Beta posterior of every
+arm and returns the arm with the largest draw.  This converges to the best arm
+far faster than the uniform random choice used in earlier prototypes.  The
+class is used by the write gate to decide which of several competing self
+rules to apply in a given context.
 """
 
 import random
 
 
 class SimpleBandit:
-    """A trivial bandit that picks a random arm and tracks successes and failures."""
+    """A bandit that picks arms via Thompson sampling over Beta posteriors."""
 
     def __init__(self) -> None:
+        # Parallel arrays are the source of truth; the dicts below are kept in
+        # sync as read‑only views for API compatibility.
+        self._arms: list[str] = []
+        self._s: list[int] = []
+        self._f: list[int] = []
+        self._pos: dict[str, int] = {}
+        self._rng = random.Random()
         self.success: dict[str, int] = {}
         self.failure: dict[str, int] = {}
 
     def add_if_absent(self, arm: str) -> None:
         """Register a new arm if it does not already exist."""
-        if arm not in self.success:
+        if arm not in self._pos:
+            self._pos[arm] = len(self._arms)
+            self._arms.append(arm)
+            self._s.append(1)
+            self._f.append(1)
             self.success[arm] = 1
             self.failure[arm] = 1
 
     def select(self) -> str | None:
-        """Select an arm uniformly at random.
+        """Select an arm by Thompson sampling.
+
+        One sample is drawn from the Beta(successes, failures) posterior of
+        every arm; the arm with the largest sample is returned.
 
         Returns:
             The name of the selected arm, or ``None`` if no arms exist.
         """
-        arms = list(self.success.keys())
-        return random.choice(arms) if arms else None
+        if not self._arms:
+            return None
+        # Sample-and-max in one streaming pass: never materialize the per-arm
+        # sample distribution, just track the running best draw.
+        beta = self._rng.betavariate
+        best = -1.0
+        best_i = 0
+        for i, (s, f) in enumerate(zip(self._s, self._f)):
+            draw = beta(s, f)
+            if draw > best:
+                best = draw
+                best_i = i
+        return self._arms[best_i]
 
     def update(self, arm: str, reward: float) -> None:
         """Update the bandit with the result of choosing an arm.
@@ -39,9 +66,12 @@ class SimpleBandit:
             arm: The arm that was selected.
             reward: Positive values indicate a success, non‑positive a failure.
         """
-        if arm not in self.success:
+        if arm not in self._pos:
             self.add_if_absent(arm)
+        i = self._pos[arm]
         if reward > 0:
+            self._s[i] += 1
             self.success[arm] += 1
         else:
+            self._f[i] += 1
             self.failure[arm] += 1
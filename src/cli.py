@@ -10,7 +10,7 @@ be a JSON object with at least ``role`` ("user" or "assistant") and
 
 to set metadata for the self‑write‑gate.  Only assistant replies are
 processed; user messages are ignored by the write gate.  Persisted rules are
-written to ``data/self_memory.json`` under the root directory.
+written to ``data/self_memory.jsonl`` under the root directory.
 """
 
 from __future__ import annotations
@@ -21,7 +21,25 @@ from pathlib import Path
 
 from .self_gate import SelfWriteGate
 from .storage import SelfMemoryStore
-from .self_insights_generic import SelfInsightExtractorGeneric
+from .self_insights_generic import SelfInsightExtractorGeneric, now_iso
+
+
+def _collect_line(line: bytes, turns: list, fallback_time: str) -> None:
+    """Parse one JSONL line and collect it if it is an assistant turn."""
+    if not line:
+        return
+    try:
+        msg = json.loads(line)
+    except json.JSONDecodeError:
+        return
+    if msg.get("role") != "assistant":
+        return
+    text = msg.get("content", "")
+    meta = {
+        "time": msg.get("time") or fallback_time,
+        "user_lang": msg.get("user_lang"),
+    }
+    turns.append((text, meta))
 
 
 def main() -> None:
@@ -38,25 +56,31 @@ def main() -> None:
     extractor = SelfInsightExtractorGeneric()
     gate = SelfWriteGate(store=store, extractor=extractor)
 
-    # Process the chat line by line
-    with path.open("r", encoding="utf-8") as f:
-        for line in f:
-            line = line.strip()
-            if not line:
-                continue
-            try:
-                msg = json.loads(line)
-            except json.JSONDecodeError:
-                continue
-            # Only process assistant turns
-            if msg.get("role") != "assistant":
+    # Timestamp formatted once for the whole run; turns without their own
+    # time share it instead of formatting a fresh one per line.
+    fallback_time = now_iso()
+
+    # Read the chat in 1 MiB chunks, splitting on newlines ourselves.
+    # Lines are fed to json.loads as bytes, so no per-line decode or strip
+    # happens on the Python side.
+    turns: list[tuple[str, dict]] = []
+    with path.open("rb") as f:
+        pending: list[bytes] = []
+        while True:
+            chunk = f.read(1 << 20)
+            if not chunk:
+                break
+            if b"\n" not in chunk:
+                pending.append(chunk)
                 continue
-            text = msg.get("content", "")
-            meta = {
-                "time": msg.get("time"),
-                "user_lang": msg.get("user_lang"),
-            }
-            gate.process_assistant_turn(text, meta)
+            lines = b"".join(pending + [chunk]).split(b"\n")
+            pending = [lines.pop()]
+            for line in lines:
+                _collect_line(line, turns, fallback_time)
+        _collect_line(b"".join(pending), turns, fallback_time)
+
+    # Run the gate over all turns, persisting accepted rules in one write
+    gate.process_batch(turns)
 
     # Print summary of stored rules
     items = store.list_items()
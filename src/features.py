@@ -11,7 +11,14 @@ extraction function.
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import Optional
+from typing import Any, Dict, Optional, Protocol
+
+
+class _Turn(Protocol):
+    """Shape of a turn object accepted by :meth:`FeatureExtractor.from_turns`."""
+
+    content: str
+    user_lang: Optional[str]
 
 
 @dataclass
@@ -26,15 +33,25 @@ class ContextFeatures:
 class FeatureExtractor:
     """Extracts :class:`ContextFeatures` from the latest user turn.
 
-    This stub simply sets ``user_lang`` from the provided metadata and tests
+    This stub simply sets ``user_lang`` from the provided turn and tests
     whether the user message ends with a question mark or contains a code
-    block (````` markers).
+    block (````` markers).  The turn may be a plain dict (as parsed from a
+    JSONL log) or any object with ``content``/``user_lang`` attributes.
     """
 
-    def from_turns(self, user_turn: Any) -> ContextFeatures:
-        text: str = getattr(user_turn, "content", "")
-        user_lang: Optional[str] = getattr(user_turn, "user_lang", None)
-        user_asks_question: bool = text.strip().endswith("?")
+    def from_turns(self, user_turn: _Turn | Dict[str, Any]) -> ContextFeatures:
+        if isinstance(user_turn, dict):
+            text: str = user_turn.get("content", "")
+            user_lang: Optional[str] = user_turn.get("user_lang")
+        else:
+            text = user_turn.content
+            user_lang = user_turn.user_lang
+        # Walk back over trailing whitespace instead of allocating a stripped
+        # copy of the whole message just to look at its last character.
+        i = len(text) - 1
+        while i >= 0 and text[i].isspace():
+            i -= 1
+        user_asks_question: bool = i >= 0 and text[i] == "?"
         user_has_code_block: bool = "```" in text
         return ContextFeatures(
             user_lang=user_lang,
@@ -10,11 +10,9 @@ silently.
 
 from __future__ import annotations
 
-import uuid
-from datetime import datetime, timezone
 from typing import List, Dict, Any, Optional
 
-from .self_insights_generic import SelfInsightExtractorGeneric, SelfCandidate
+from .self_insights_generic import SelfInsightExtractorGeneric, SelfCandidate, _short_id, now_iso
 from .storage import SelfMemoryStore, SelfMemoryItem
 from .config import GateConfig
 
@@ -32,8 +30,12 @@ class SelfWriteGate:
 
     def __init__(self, store: SelfMemoryStore | None = None, extractor: SelfInsightExtractorGeneric | None = None, config: GateConfig | None = None) -> None:
         self.store = store or SelfMemoryStore()
-        self.extractor = extractor or SelfInsightExtractorGeneric()
         self.config = config or GateConfig()
+        # Bake the configured threshold into the extractor once, instead of
+        # consulting the config object per turn.
+        self.extractor = extractor or SelfInsightExtractorGeneric(
+            long_len_threshold=self.config.long_len_threshold
+        )
         self.turn_counter: int = 0
         self.last_saved_turn: int = -999
         self.last_saved_day: Optional[str] = None
@@ -50,29 +52,58 @@ class SelfWriteGate:
         Returns:
             A list of :class:`SelfMemoryItem` objects that were persisted (0–1).
         """
-        meta = meta or {}
+        item = self._consider(assistant_text, meta or {})
+        if item is None:
+            return []
+        self.store.upsert(item)
+        return [item]
+
+    def process_batch(self, turns: List[tuple[str, Dict[str, Any]]]) -> List[SelfMemoryItem]:
+        """Process many assistant turns and persist all accepted rules at once.
+
+        The spacing policy is applied over the turns in order exactly as it
+        would be turn by turn, but the accepted items are handed to the store
+        in a single :meth:`SelfMemoryStore.upsert_many` call instead of one
+        write per turn.
+
+        Args:
+            turns: ``(assistant_text, meta)`` pairs in conversation order.
+
+        Returns:
+            The list of :class:`SelfMemoryItem` objects that were persisted.
+        """
+        accepted: List[SelfMemoryItem] = []
+        for assistant_text, meta in turns:
+            item = self._consider(assistant_text, meta or {})
+            if item is not None:
+                accepted.append(item)
+        self.store.upsert_many(accepted)
+        return accepted
+
+    def _consider(self, assistant_text: str, meta: Dict[str, Any]) -> Optional[SelfMemoryItem]:
+        """Run extraction and the spacing policy; build but do not persist."""
         self.turn_counter += 1
-        when = meta.get("time") or datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+        when = meta.get("time") or now_iso()
         today = day_bucket(when)
 
         # Rate limiting: enforce a minimum gap in turns between saves
         if (self.turn_counter - self.last_saved_turn) < self.config.min_gap_turns:
-            return []
+            return None
 
-        # Extract candidate rules
-        candidates: List[SelfCandidate] = self.extractor.extract(assistant_text, meta)
+        # Extract candidate rules, reusing the timestamp computed above
+        candidates: List[SelfCandidate] = self.extractor.extract(assistant_text, meta, when=when)
         if not candidates:
-            return []
+            return None
 
         # Avoid saving multiple rules per day
         if self.last_saved_day == today:
-            return []
+            return None
 
         # Pick the first candidate (no ranking in this prototype)
         c = candidates[0]
         # Build a memory item
         mem_item = SelfMemoryItem(
-            id="mi_" + uuid.uuid4().hex[:8],
+            id=_short_id("mi_"),
             about="self",
             kind=c.kind,
             claim=c.claim,
@@ -82,10 +113,8 @@ class SelfWriteGate:
             created_at=when,
             last_seen_at=when,
             recurrence=1,
-            tags=c.signals,
+            tags=list(c.signals),
         )
-        # Persist
-        self.store.upsert(mem_item)
         self.last_saved_turn = self.turn_counter
         self.last_saved_day = today
-        return [mem_item]
+        return mem_item
@@ -11,10 +11,12 @@ questions at the end of an answer or unstructured overly long responses.
 
 from __future__ import annotations
 
+import itertools
+import os
 import re
-import uuid
+import sys
 from dataclasses import dataclass
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Sequence
 from datetime import datetime, timezone
 
 # Helper to produce ISO‑8601 timestamps
@@ -23,6 +25,17 @@ def now_iso() -> str:
     return datetime.now(timezone.utc).strftime(ISO)
 
 
+# Cheap unique ids: one urandom read at import, then a counter.  uuid4 costs a
+# syscall per call, which is pure overhead for an opaque short tag.
+_SALT = os.urandom(4).hex()
+_COUNTER = itertools.count()
+
+
+def _short_id(prefix: str) -> str:
+    """Return a process-unique id such as ``cp_1a2b3c4d00001``."""
+    return f"{prefix}{_SALT}{next(_COUNTER):05x}"
+
+
 @dataclass
 class Evidence:
     """Minimal evidence pointer for a candidate insight."""
@@ -39,21 +52,157 @@ class SelfCandidate:
     kind: str
     claim: str
     key: str
-    signals: List[str]
+    signals: Sequence[str]
     evidence: List[Evidence]
     recurrence_hint: int = 1
     longevity_hint: str = "long"
 
 
+# Replies shorter than this cannot plausibly fire any rule; extract returns
+# early without running a single pattern.
+MIN_TEXT_LEN = 16
+
 # Regular expressions for pattern detection
-RE_TAIL_INVITES   = re.compile(r"(если хочешь|давай обсудим|можем( вернуться)?|let me know|we can (circle back|follow up))", re.I)
-RE_APOLOGY        = re.compile(r"(извин(и|ите)|sorry|apologi[sz]|as an ai)", re.I)
-RE_MULTI_QUEST    = re.compile(r"(\?\s*){2,}$")
-RE_HEDGING        = re.compile(r"\b(возможно|кажется|похоже|можно было бы|probably|perhaps|maybe|i think)\b", re.I)
+RE_TAIL_INVITES   = re.compile(r"(?:если хочешь|давай обсудим|можем(?: вернуться)?|let me know|we can (?:circle back|follow up))", re.I)
+RE_APOLOGY        = re.compile(r"(?:извин(?:и|ите)|sorry|apologi[sz]|as an ai)", re.I)
+RE_HEDGING        = re.compile(r"\b(?:возможно|кажется|похоже|можно было бы|probably|perhaps|maybe|i think)\b", re.I)
 RE_CODE_BLOCK     = re.compile(r"```[\s\S]+?```")
 RE_STRUCT_KV      = re.compile(r"^\s*[\w\- ]{1,32}\s*[:：]\s*.+$", re.M)
-RE_LANG_CYR       = re.compile(r"[А-Яа-яЁё]")  # crude detection of Cyrillic
 RE_NUMBER_MIX     = re.compile(r"\b\d{1,3}[.,]\d{3}\b")
+RE_CODE_NOTES     = re.compile(r"(?:делает|использование|run|usage|пример|example):", re.I)
+
+# The boolean presence checks above are folded into one alternation so a
+# single scan over the text reports every pattern that occurs.  The counting
+# RE_STRUCT_KV pattern cannot be combined and still runs on its own.
+RE_COMBINED = re.compile(
+    "|".join(
+        f"(?P<{name}>{rx.pattern})"
+        for name, rx in [
+            ("tail_invites", RE_TAIL_INVITES),
+            ("apology", RE_APOLOGY),
+            ("hedging", RE_HEDGING),
+            ("code_block", RE_CODE_BLOCK),
+            ("number_mix", RE_NUMBER_MIX),
+        ]
+    ),
+    re.I,
+)
+_N_COMBINED = 5
+
+
+def _has_cyrillic(text: str) -> bool:
+    """Crude detection of Cyrillic: any code point in the U+0400 block.
+
+    ``str.isascii`` runs at C speed and rejects the common all-ASCII case
+    before the per-character scan; the scan itself short-circuits on the
+    first hit, so no regex machinery is involved.
+    """
+    if text.isascii():
+        return False
+    return any("\u0400" <= ch <= "\u04ff" for ch in text)
+
+
+def _tail_question_count(text: str) -> int:
+    """Count question marks in the trailing run of ``?`` and whitespace.
+
+    Walks backwards from the end of the string, so the cost is bounded by the
+    length of the tail rather than the whole reply.
+    """
+    count = 0
+    i = len(text) - 1
+    while i >= 0:
+        ch = text[i]
+        if ch == "?":
+            count += 1
+        elif not ch.isspace():
+            break
+        i -= 1
+    return count
+
+
+def _scan_patterns(text: str) -> set[str]:
+    """Return the names of all combined patterns that occur in ``text``."""
+    found: set[str] = set()
+    for m in RE_COMBINED.finditer(text):
+        found.add(m.lastgroup)
+        if len(found) == _N_COMBINED:
+            break
+    return found
+
+
+# Static (kind, claim, key, signals) tuples for every rule the extractor can
+# emit.  Detection only collects rule names; candidates are built from this
+# table in a single loop afterwards.  Signals are tuples so every candidate
+# shares one immutable constant instead of aliasing a mutable list.
+_RULE_TABLE: Dict[str, tuple[str, str, str, tuple[str, ...]]] = {
+    "tail_invites": (
+        "belief",
+        "belief:no_tail_invites — avoid ending replies with invitations such as ‘if you want’, ‘let me know’ or similar phrases",
+        "belief:no_tail_invites",
+        ("tail_invites",),
+    ),
+    "apology": (
+        "belief",
+        "belief:no_apologies — avoid unnecessary apologies or AI meta",
+        "belief:no_apologies",
+        ("apology_or_ai_meta",),
+    ),
+    "multi_quest": (
+        "belief",
+        "belief:ask_when_needed — limit trailing questions to at most one relevant question",
+        "belief:ask_when_needed",
+        ("multi_tail_questions",),
+    ),
+    "long_unstructured": (
+        "style",
+        "style:shorter_blocks — keep answers concise and structured (use paragraphs or lists)",
+        "style:shorter_blocks",
+        ("too_long_or_unstructured",),
+    ),
+    "hedging": (
+        "style",
+        "style:reduce_hedging — minimise use of hedging words such as ‘perhaps’, ‘maybe’, ‘probably’",
+        "style:reduce_hedging",
+        ("hedging",),
+    ),
+    "code_without_notes": (
+        "format",
+        "format:code_with_min_notes — accompany code blocks with a short explanation of what it does",
+        "format:code_with_min_notes",
+        ("code_without_notes",),
+    ),
+    "kv_struct": (
+        "format",
+        "format:use_table_when_structured — present long key‑value lists as a table",
+        "format:use_table_when_structured",
+        ("kv_struct_detected",),
+    ),
+    "lang_ru": (
+        "style",
+        "style:mirror_user_language — reply in the user’s language (ru)",
+        "style:mirror_user_language_ru",
+        ("lang_mismatch",),
+    ),
+    "lang_en": (
+        "style",
+        "style:mirror_user_language — reply in the user’s language (en)",
+        "style:mirror_user_language_en",
+        ("lang_mismatch",),
+    ),
+    "locale": (
+        "style",
+        "style:respect_user_locale — format numbers and dates according to the user’s locale",
+        "style:respect_user_locale",
+        ("locale_mismatch",),
+    ),
+}
+
+# Kind and key constants flow into dict lookups downstream (dedup in the
+# store, bandit arms); interning lets those compare by pointer.
+_RULE_TABLE = {
+    name: (sys.intern(kind), claim, sys.intern(key), signals)
+    for name, (kind, claim, key, signals) in _RULE_TABLE.items()
+}
 
 
 class SelfInsightExtractorGeneric:
@@ -70,117 +219,73 @@ class SelfInsightExtractorGeneric:
     """
 
     def __init__(self, long_len_threshold: int = 1200, user_lang_hint: str | None = None) -> None:
-        self.long_len_threshold = long_len_threshold
+        self.long_len_threshold = int(long_len_threshold)
         self.user_lang_hint = user_lang_hint  # 'ru'|'en'|None
 
-    def extract(self, assistant_text: str, meta: Dict[str, Any]) -> List[SelfCandidate]:
+    def extract(self, assistant_text: str, meta: Dict[str, Any], when: str | None = None) -> List[SelfCandidate]:
         text = assistant_text.strip()
-        when = meta.get("time") or now_iso()
-        candidates: List[SelfCandidate] = []
-
-        def add(kind: str, claim: str, key: str, signals: List[str]):
-            candidates.append(SelfCandidate(
-                id="cp_" + uuid.uuid4().hex[:8],
-                about="self",
-                kind=kind,
-                claim=claim.strip(),
-                key=key,
-                signals=signals,
-                evidence=[Evidence(src="assistant", time=when)],
-                recurrence_hint=1,
-                longevity_hint="long",
-            ))
+        n = len(text)
+        if n < MIN_TEXT_LEN:
+            return []
+        if when is None:
+            when = meta.get("time") or now_iso()
+        found = _scan_patterns(text)
+        fired: List[str] = []
 
         # Trailing invitations
-        if RE_TAIL_INVITES.search(text):
-            add(
-                "belief",
-                "belief:no_tail_invites — avoid ending replies with invitations such as ‘if you want’, ‘let me know’ or similar phrases",
-                "belief:no_tail_invites",
-                ["tail_invites"],
-            )
+        if "tail_invites" in found:
+            fired.append("tail_invites")
 
         # Apologies or AI meta
-        if RE_APOLOGY.search(text):
-            add(
-                "belief",
-                "belief:no_apologies — avoid unnecessary apologies or AI meta",
-                "belief:no_apologies",
-                ["apology_or_ai_meta"],
-            )
+        if "apology" in found:
+            fired.append("apology")
 
         # Multiple questions at end
-        if RE_MULTI_QUEST.search(text):
-            add(
-                "belief",
-                "belief:ask_when_needed — limit trailing questions to at most one relevant question",
-                "belief:ask_when_needed",
-                ["multi_tail_questions"],
-            )
-
-        # Long or unstructured
-        if len(text) > self.long_len_threshold or (len(text.splitlines()) == 1 and len(text) > 800):
-            add(
-                "style",
-                "style:shorter_blocks — keep answers concise and structured (use paragraphs or lists)",
-                "style:shorter_blocks",
-                ["too_long_or_unstructured"],
-            )
+        if _tail_question_count(text) >= 2:
+            fired.append("multi_quest")
+
+        # Long or unstructured (a single-line reply has no newline at all,
+        # so the containment test replaces counting lines via splitlines)
+        if n > self.long_len_threshold or ("\n" not in text and n > 800):
+            fired.append("long_unstructured")
 
         # Hedging words
-        if RE_HEDGING.search(text):
-            add(
-                "style",
-                "style:reduce_hedging — minimise use of hedging words such as ‘perhaps’, ‘maybe’, ‘probably’",
-                "style:reduce_hedging",
-                ["hedging"],
-            )
+        if "hedging" in found:
+            fired.append("hedging")
 
         # Code without context
-        if RE_CODE_BLOCK.search(text):
-            if not re.search(r"(делает|использование|run|usage|пример|example):", text, re.I):
-                add(
-                    "format",
-                    "format:code_with_min_notes — accompany code blocks with a short explanation of what it does",
-                    "format:code_with_min_notes",
-                    ["code_without_notes"],
-                )
+        if "code_block" in found and not RE_CODE_NOTES.search(text):
+            fired.append("code_without_notes")
 
         # Semi‑structured key‑value lists
         if len(RE_STRUCT_KV.findall(text)) >= 3:
-            add(
-                "format",
-                "format:use_table_when_structured — present long key‑value lists as a table",
-                "format:use_table_when_structured",
-                ["kv_struct_detected"],
-            )
+            fired.append("kv_struct")
 
         # Language mismatch
         user_lang = self.user_lang_hint or meta.get("user_lang")
         if user_lang in {"ru", "en"}:
-            has_cyr = bool(RE_LANG_CYR.search(text))
+            has_cyr = _has_cyrillic(text)
             if user_lang == "ru" and not has_cyr:
-                add(
-                    "style",
-                    "style:mirror_user_language — reply in the user’s language (ru)",
-                    "style:mirror_user_language_ru",
-                    ["lang_mismatch"],
-                )
+                fired.append("lang_ru")
             if user_lang == "en" and has_cyr:
-                add(
-                    "style",
-                    "style:mirror_user_language — reply in the user’s language (en)",
-                    "style:mirror_user_language_en",
-                    ["lang_mismatch"],
-                )
+                fired.append("lang_en")
 
         # Locale mismatch for numbers
-        if RE_NUMBER_MIX.search(text):
-            add(
-                "style",
-                "style:respect_user_locale — format numbers and dates according to the user’s locale",
-                "style:respect_user_locale",
-                ["locale_mismatch"],
-            )
+        if "number_mix" in found:
+            fired.append("locale")
 
+        candidates: List[SelfCandidate] = []
+        for name in fired:
+            kind, claim, key, signals = _RULE_TABLE[name]
+            candidates.append(SelfCandidate(
+                id=_short_id("cp_"),
+                about="self",
+                kind=kind,
+                claim=claim,
+                key=key,
+                signals=signals,
+                evidence=[Evidence(src="assistant", time=when)],
+                recurrence_hint=1,
+                longevity_hint="long",
+            ))
         return candidates
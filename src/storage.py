@@ -1,17 +1,38 @@
 """
-Simple JSON‑backed storage for self memory items.
+Append‑only JSONL storage for self memory items.
 
-The :class:`SelfMemoryStore` class reads and writes a JSON file on disk.  Each
-entry in the memory is represented by the :class:`SelfMemoryItem` dataclass.
+The :class:`SelfMemoryStore` class keeps the live state in column‑oriented
+parallel lists (one list per field) plus an ``(about, key) -> row`` index, and
+records every upsert as one JSON line appended to a log file on disk.  The log
+starts with an optional columnar snapshot line written by compaction; the row
+records that follow replay on top of it (later records win).  Each entry is
+represented by the :class:`SelfMemoryItem` dataclass.
 """
 
 from __future__ import annotations
 
 import json
-from dataclasses import dataclass, asdict
+import os
+from dataclasses import dataclass, fields
 from pathlib import Path
 from typing import List, Dict, Any
 
+# orjson serializes straight to compact UTF-8 bytes several times faster than
+# the stdlib encoder; fall back to an equivalent compact json.dumps when it is
+# not installed.
+try:
+    import orjson
+
+    def _dumps(obj: Any) -> bytes:
+        return orjson.dumps(obj)
+
+    _loads = orjson.loads
+except ImportError:
+    def _dumps(obj: Any) -> bytes:
+        return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+    _loads = json.loads
+
 @dataclass
 class SelfMemoryItem:
     """Representation of a persisted self‑rule.
@@ -44,49 +65,139 @@ class SelfMemoryItem:
     tags: List[str]
 
 
+_FIELDS = tuple(f.name for f in fields(SelfMemoryItem))
+
+
 class SelfMemoryStore:
-    """A simple on‑disk store for :class:`SelfMemoryItem` objects.
+    """An append‑only on‑disk store for :class:`SelfMemoryItem` objects.
 
-    By default the store writes to ``data/self_memory.json`` under the given
-    ``root`` directory.  When persisting items the store deduplicates by
-    ``key`` within the same ``about`` namespace.
+    By default the store logs to ``data/self_memory.jsonl`` under the given
+    ``root`` directory.  Upserts deduplicate by ``key`` within the same
+    ``about`` namespace through the row index and touch only the few columns
+    that change, so a write is O(1) in the number of stored rules rather than
+    a rewrite of the whole file.
     """
 
     def __init__(self, root: str = ".") -> None:
         self.root = Path(root)
-        self.path: Path = self.root / "data" / "self_memory.json"
-        self.path.parent.mkdir(parents=True, exist_ok=True)
-        if not self.path.exists():
-            self._save({"items": []})
+        self.log_path: Path = self.root / "data" / "self_memory.jsonl"
+        self.log_path.parent.mkdir(parents=True, exist_ok=True)
+        self._cols: Dict[str, list] | None = None
+        self._idx: Dict[tuple[str, str], int] = {}
+        self._log_lines: int = 0
+        self._log_fd: int | None = None
+
+    def _load(self) -> Dict[str, list]:
+        """Replay the log into the columns, lazily, on first access."""
+        if self._cols is None:
+            self._cols = {name: [] for name in _FIELDS}
+            self._idx = {}
+            self._log_lines = 0
+            if self.log_path.exists():
+                with self.log_path.open("r", encoding="utf-8") as f:
+                    for line in f:
+                        if not line.strip():
+                            continue
+                        rec = _loads(line)
+                        if "columns" in rec:
+                            self._cols = rec["columns"]
+                            self._idx = {
+                                (about, key): i
+                                for i, (about, key) in enumerate(
+                                    zip(self._cols["about"], self._cols["key"])
+                                )
+                            }
+                        else:
+                            self._apply(rec)
+                        self._log_lines += 1
+        return self._cols
 
-    def _load(self) -> Dict[str, Any]:
-        return json.loads(self.path.read_text() or "{\"items\": []}")
+    def _apply(self, rec: Dict[str, Any]) -> None:
+        """Merge one row record into the columns (later records win)."""
+        i = self._idx.get((rec["about"], rec["key"]))
+        if i is None:
+            self._idx[(rec["about"], rec["key"])] = len(self._cols["id"])
+            for name in _FIELDS:
+                self._cols[name].append(rec[name])
+        else:
+            for name in _FIELDS:
+                self._cols[name][i] = rec[name]
 
-    def _save(self, data: Dict[str, Any]) -> None:
-        self.path.write_text(json.dumps(data, ensure_ascii=False, indent=2))
+    def _row(self, i: int) -> Dict[str, Any]:
+        return {name: self._cols[name][i] for name in _FIELDS}
+
+    def _fd(self) -> int:
+        if self._log_fd is None:
+            self._log_fd = os.open(
+                self.log_path, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644
+            )
+        return self._log_fd
+
+    def _append(self, rec: Dict[str, Any]) -> None:
+        os.write(self._fd(), _dumps(rec) + b"\n")
+        self._log_lines += 1
+
+    def _merge(self, item: SelfMemoryItem) -> int:
+        """Merge ``item`` into the columns and return its row index."""
+        cols = self._load()
+        i = self._idx.get((item.about, item.key))
+        if i is not None:
+            # Update existing entry in place, touching only changed columns
+            cols["last_seen_at"][i] = item.last_seen_at
+            cols["recurrence"][i] += 1
+            cols["confidence"][i] = max(cols["confidence"][i], item.confidence)
+            cols["utility"][i] = max(cols["utility"][i], item.utility)
+        else:
+            i = len(cols["id"])
+            self._idx[(item.about, item.key)] = i
+            # Shallow copy is enough: the dataclass is flat (primitives plus a
+            # list of strings), so asdict's recursive deep copy is wasted work.
+            for name, value in item.__dict__.items():
+                cols[name].append(value)
+        return i
 
     def upsert(self, item: SelfMemoryItem) -> None:
-        data = self._load()
-        items = data.get("items", [])
-        for i, it in enumerate(items):
-            if it.get("key") == item.key and it.get("about") == item.about:
-                # Update existing entry
-                it["last_seen_at"] = item.last_seen_at
-                it["recurrence"] = it.get("recurrence", 1) + 1
-                it["confidence"] = max(it.get("confidence", 0.0), item.confidence)
-                it["utility"] = max(it.get("utility", 0.0), item.utility)
-                items[i] = it
-                data["items"] = items
-                self._save(data)
-                return
-        # Otherwise append new
-        items.append(asdict(item))
-        data["items"] = items
-        self._save(data)
+        """Insert ``item`` or merge it into the entry sharing its identity.
+
+        Deduplication is a single lookup in the ``(about, key)`` row index,
+        which is built once when the log is replayed and kept current by
+        inserts, so no scan over existing entries happens per write.
+        """
+        i = self._merge(item)
+        self._append(self._row(i))
+        if self._log_lines > 2 * len(self._idx):
+            self.compact()
+
+    def upsert_many(self, items: List[SelfMemoryItem]) -> None:
+        """Upsert several items, appending all their records in one write."""
+        if not items:
+            return
+        buf = bytearray()
+        for item in items:
+            buf += _dumps(self._row(self._merge(item))) + b"\n"
+        os.write(self._fd(), buf)
+        self._log_lines += len(items)
+        if self._log_lines > 2 * len(self._idx):
+            self.compact()
+
+    def compact(self) -> None:
+        """Rewrite the log as one columnar snapshot of the live entries.
+
+        A single ``{"columns": {...}}`` line stores each field name once
+        instead of repeating it per entry, so the snapshot is smaller than
+        the equivalent row records.
+        """
+        cols = self._load()
+        if self._log_fd is not None:
+            os.close(self._log_fd)
+            self._log_fd = None
+        tmp = self.log_path.with_suffix(".jsonl.tmp")
+        tmp.write_bytes(_dumps({"columns": cols}) + b"\n")
+        tmp.replace(self.log_path)
+        self._log_lines = 1
 
     def list_items(self) -> List[SelfMemoryItem]:
-        data = self._load()
-        out: List[SelfMemoryItem] = []
-        for it in data.get("items", []):
-            out.append(SelfMemoryItem(**it))
-        return out
+        cols = self._load()
+        return [
+            SelfMemoryItem(*values) for values in zip(*(cols[name] for name in _FIELDS))
+        ]